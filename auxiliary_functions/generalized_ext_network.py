@@ -1,5 +1,6 @@
 from itertools import chain, combinations
 from auxiliary_functions.min_cut_LP import min_cut_over_time
+from auxiliary_functions.instrumentation import get_instrumentation
 
 def all_valid_subsets(S_plus, S_minus):
     """
@@ -53,8 +54,11 @@ def aggregate_cut_time_points(sources, sinks, arcs, capacities, transit_times, t
     - list: A sorted list of distinct time points derived from min-cut calculations over subsets of terminals.
     """
 
+    stats = get_instrumentation()
+
     # Compute all subsets of S such that S+ ∩ X and S- \ X non-empty
-    valid_subsets = all_valid_subsets(sources, sinks)
+    with stats.timer('aggregate.enumerate_subsets'):
+        valid_subsets = all_valid_subsets(sources, sinks)
 
     # Compute "interesting" time points, i.e. all time points from the min-cuts over time for differens 
     # subsets of terminals 
@@ -71,7 +75,9 @@ def aggregate_cut_time_points(sources, sinks, arcs, capacities, transit_times, t
         alpha, _ = min_cut_over_time(arcs, capacities, transit_times, time_horizon, S_plus_X, S_minus_X)
         
         # Update time_points to include unique values from both time_points and alpha's values 
-        time_points = sorted(list(set(time_points) | set(alpha.values())))
+        with stats.timer('aggregate.merge'):
+            time_points = sorted(list(set(time_points) | set(alpha.values())))
+        stats.count('aggregate.subsets_processed')
 
         print('\nX:', X)
         print('S+ ∩ X', S_plus_X)
@@ -96,16 +102,20 @@ def create_A_inf(nodes, time_points):
         - lengths (dict): Dictionary with arc tuples as keys and calculated lengths (difference between consecutive time layers) as values.
     """
     
-    A_inf = []
-    capacities = {}
-    lengths = {}
-    for node in nodes:
-        for i in range(len(time_points) - 1):
-            v = f'{node}^{time_points[i]}'
-            w = f'{node}^{time_points[i+1]}'
-            A_inf.append((v,w))
-            capacities[(v,w)] = 10000
-            lengths[(v,w)] = time_points[i+1] - time_points[i]
+    stats = get_instrumentation()
+
+    with stats.timer('network.create_A_inf'):
+        A_inf = []
+        capacities = {}
+        lengths = {}
+        for node in nodes:
+            for i in range(len(time_points) - 1):
+                v = f'{node}^{time_points[i]}'
+                w = f'{node}^{time_points[i+1]}'
+                A_inf.append((v,w))
+                capacities[(v,w)] = 10000
+                lengths[(v,w)] = time_points[i+1] - time_points[i]
+    stats.count('network.A_inf_arcs', len(A_inf))
     return A_inf, capacities, lengths
 
 # arcs = [(1, 2), (1, 3), (2, 4), (3, 4)]  # Arcs in the network
@@ -0,0 +1,119 @@
+import json
+import time
+import warnings
+from contextlib import contextmanager, nullcontext
+
+
+class Instrumentation:
+    """
+    Collects per-stage timers and counters of a run and forwards every measurement to registered hooks.
+
+    A hook is any callable `hook(kind, name, value)`, where `kind` is either 'timer' (value in seconds)
+    or 'counter' (value is the increment). A hook that raises does not interrupt the instrumented run:
+    the exception is reported as a RuntimeWarning and the remaining hooks are still called. When `enabled`
+    is False, `timer` and `count` return immediately so that the instrumented code paths carry (almost)
+    no overhead.
+    """
+
+    def __init__(self, enabled=True, hooks=None):
+        self.enabled = enabled
+        self.hooks = list(hooks or [])
+        self.timers = {}
+        self.counters = {}
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+
+    def timer(self, stage):
+        """
+        Returns a context manager that measures the wall time of the enclosed block under `stage`.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(stage)
+
+    @contextmanager
+    def _timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, time.perf_counter() - start)
+
+    def record_time(self, stage, seconds):
+        if not self.enabled:
+            return
+        entry = self.timers.setdefault(stage, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0})
+        entry['calls'] += 1
+        entry['total_s'] += seconds
+        entry['max_s'] = max(entry['max_s'], seconds)
+        self._notify('timer', stage, seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + n
+        self._notify('counter', name, n)
+
+    def _notify(self, kind, name, value):
+        for hook in self.hooks:
+            try:
+                hook(kind, name, value)
+            except Exception as e:
+                warnings.warn(f"Instrumentation hook {hook!r} failed on {kind} {name!r}: {e!r}", RuntimeWarning)
+
+    def summary(self):
+        """
+        Returns all timers and counters collected so far as a dictionary.
+        """
+        return {'timers': {stage: dict(entry) for stage, entry in self.timers.items()},
+                'counters': dict(self.counters)}
+
+    def to_json(self, path=None, indent=2):
+        """
+        Returns the summary as a JSON string and, if `path` is given, also writes it to that file.
+        """
+        text = json.dumps(self.summary(), indent=indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+
+# Instrumentation used by the solve pipeline; disabled unless `enable_instrumentation` is called
+_active = Instrumentation(enabled=False)
+
+
+def get_instrumentation():
+    return _active
+
+
+def enable_instrumentation(hooks=None):
+    """
+    Activates a fresh `Instrumentation` for `min_cut_over_time`, `aggregate_cut_time_points` and the
+    network builders and returns it.
+
+    Parameters:
+    - hooks (list): Optional callables `hook(kind, name, value)` that receive every measurement.
+
+    Returns:
+    - Instrumentation: The now active instrumentation.
+    """
+    global _active
+    _active = Instrumentation(enabled=True, hooks=hooks)
+    return _active
+
+
+def disable_instrumentation():
+    global _active
+    _active = Instrumentation(enabled=False)
+
+
+# # Example usage
+# stats = enable_instrumentation(hooks=[lambda kind, name, value: print(kind, name, value)])
+# time_points = aggregate_cut_time_points(sources, sinks, arcs, capacities, transit_times, time_horizon)
+# print(stats.to_json())
@@ -1,7 +1,28 @@
-from gurobipy import Model, GRB
+import os
+from gurobipy import Env, Model, GRB
+from auxiliary_functions.instrumentation import get_instrumentation
+
+# Gurobi environment shared by all models built in this process, see get_env()
+_env = None
+_env_pid = None
+
+
+def get_env():
+    """
+    Returns the Gurobi environment shared by all models of this process. It is created on first use
+    (and again in a forked child), so environment setup and license checks happen once per process.
+    """
+    global _env, _env_pid
+    if _env is None or _env_pid != os.getpid():
+        _env = Env()
+        _env_pid = os.getpid()
+    return _env
+
 
 def min_cut_over_time(arcs, capacities, transit_times, T, S_plus_X, S_minus_X):
 
+    stats = get_instrumentation()
+
     # Extend the nerwork with the supersource psi and connecting arcs to S_plus_X and from S_minus_X 
     # Make copies to not change the original arcs, capacities and transit_times
     A, u, tau = arcs.copy(), capacities.copy(), transit_times.copy()
@@ -17,54 +38,163 @@ def min_cut_over_time(arcs, capacities, transit_times, T, S_plus_X, S_minus_X):
         tau[(t,'psi')] = -T
 
     # Create a new model
-    model = Model("LP_Model")
+    with stats.timer('min_cut.build'):
+        model = Model("LP_Model", env=get_env())
 
-    # Variables
-    y = model.addVars(A, lb=0, name="y")  # y_a >= 0 for each a in A
-    alpha = model.addVars({v for a in A for v in a}, name="alpha")  # α_v for each node in arcs
+        # Variables
+        y = model.addVars(A, lb=0, name="y")  # y_a >= 0 for each a in A
+        alpha = model.addVars({v for a in A for v in a}, name="alpha")  # α_v for each node in arcs
 
-    # Objective function: Minimize sum of u_a * y_a
-    model.setObjective(sum(u[a] * y[a] for a in A), GRB.MINIMIZE)
+        # Objective function: Minimize sum of u_a * y_a
+        model.setObjective(sum(u[a] * y[a] for a in A), GRB.MINIMIZE)
 
-    # Constraints
-    # Constraint: y_a + α_v - α_w >= -τ_a for each arc a = (v, w)
-    for a in A:
-        v, w = a
-        model.addConstr(y[a] + alpha[v] - alpha[w] >= -tau[a], name=f"constraint_{a}")
+        # Constraints
+        # Constraint: y_a + α_v - α_w >= -τ_a for each arc a = (v, w)
+        for a in A:
+            v, w = a
+            model.addConstr(y[a] + alpha[v] - alpha[w] >= -tau[a], name=f"constraint_{a}")
 
-    # Constraint: α_s = 0 for all s in S+ ∩ X
-    for s in S_plus_X:
-        model.addConstr(alpha[s] == 0, name=f"alpha_{s}_S_plus_X")
+        # Constraint: α_s = 0 for all s in S+ ∩ X
+        for s in S_plus_X:
+            model.addConstr(alpha[s] == 0, name=f"alpha_{s}_S_plus_X")
 
-    # Constraint: α_s = T for all s in S- \ X
-    for s in S_minus_X:
-        model.addConstr(alpha[s] == T, name=f"alpha_{s}_S_minus_X")
+        # Constraint: α_s = T for all s in S- \ X
+        for s in S_minus_X:
+            model.addConstr(alpha[s] == T, name=f"alpha_{s}_S_minus_X")
 
     # Optimize the model
-    model.optimize()
-
-    # Output the results
-    if model.status == GRB.OPTIMAL:
-        print("Optimal objective value:", model.objVal)
-        for a in A:
-            print(f"y[{a}] =", y[a].x)
-        for v in alpha:
-            print(f"alpha[{v}] =", alpha[v].x)
-    else:
-        print("No optimal solution found.")
-    
-    # Remove 'psi' from alpha since psi was only an quxillary node
-    if alpha and 'psi' in alpha:
-        del alpha['psi']
-    
-    # Transform Gurobi variable alpha into dictionary
-    alpha_dict = {}
-    for a in alpha:
-        alpha_dict[a] = int(alpha[a].x)  # Access the variable's name and its solution value
+    with stats.timer('min_cut.solve'):
+        model.optimize()
+    if stats.enabled:
+        stats.count('min_cut.solves')
+        stats.count('min_cut.lp_iterations', int(model.IterCount))
+
+    with stats.timer('min_cut.extract'):
+        # Output the results
+        if model.status == GRB.OPTIMAL:
+            print("Optimal objective value:", model.objVal)
+            for a in A:
+                print(f"y[{a}] =", y[a].x)
+            for v in alpha:
+                print(f"alpha[{v}] =", alpha[v].x)
+        else:
+            print("No optimal solution found.")
+
+        # Remove 'psi' from alpha since psi was only an quxillary node
+        if alpha and 'psi' in alpha:
+            del alpha['psi']
+
+        # Transform Gurobi variable alpha into dictionary
+        alpha_dict = {}
+        for a in alpha:
+            alpha_dict[a] = int(alpha[a].x)  # Access the variable's name and its solution value
 
     return alpha_dict, y
 
 
+
+def build_cut_model(arcs, capacities, transit_times, env=None):
+    """
+    Builds the part of the min-cut-over-time LP that only depends on the network, so that it can be
+    solved repeatedly for different time horizons and terminal sets with `solve_cut_model`.
+
+    Parameters:
+    - arcs (list): List of arc tuples (v, w).
+    - capacities (dict): Capacity for each arc.
+    - transit_times (dict): Transit time for each arc.
+    - env (gurobipy.Env): Environment of the model; defaults to the shared one from `get_env`.
+
+    Returns:
+    - dict: The model together with its 'y' and 'alpha' variables and the network.
+    """
+    stats = get_instrumentation()
+
+    with stats.timer('min_cut.build'):
+        model = Model("LP_Model", env=env or get_env())
+
+        y = model.addVars(arcs, lb=0, name="y")
+        alpha = model.addVars({v for a in arcs for v in a} | {'psi'}, name="alpha")
+
+        model.setObjective(sum(capacities[a] * y[a] for a in arcs), GRB.MINIMIZE)
+
+        constrs = {}
+        for a in arcs:
+            v, w = a
+            constrs[a] = model.addConstr(y[a] + alpha[v] - alpha[w] >= -transit_times[a], name=f"constraint_{a}")
+
+        model.update()
+
+    return {'model': model, 'y': y, 'alpha': alpha, 'constrs': constrs, 'arcs': arcs}
+
+
+def add_terminal_constraints(cut_model, T, S_plus_X, S_minus_X):
+    """
+    Extends a model from `build_cut_model` with the supersource psi (as in `min_cut_over_time`) and the
+    constraints fixing the alpha-values of S+ ∩ X to 0 and of S- \\ X to T.
+
+    Raises:
+    - KeyError: If a terminal is not a node of the network; the model is left unchanged.
+
+    Returns:
+    - list: The added variables and constraints, so that they can be removed again.
+    """
+    model, alpha = cut_model['model'], cut_model['alpha']
+
+    # Check all terminals first so that a bad request cannot leave a partially extended model behind
+    unknown = [s for s in list(S_plus_X) + list(S_minus_X) if s == 'psi' or s not in alpha]
+    if unknown:
+        raise KeyError(f"Terminals {unknown} are not nodes of the network.")
+
+    psi_arcs = [('psi', s) for s in S_plus_X] + [(t, 'psi') for t in S_minus_X]
+    psi_tau = {a: (0 if a[0] == 'psi' else -T) for a in psi_arcs}
+    y_psi = model.addVars(psi_arcs, lb=0, obj=10000, name="y")  # capacity = infinity
+
+    constrs = [model.addConstr(y_psi[a] + alpha[a[0]] - alpha[a[1]] >= -psi_tau[a], name=f"constraint_{a}")
+               for a in psi_arcs]
+    constrs += [model.addConstr(alpha[s] == 0, name=f"alpha_{s}_S_plus_X") for s in S_plus_X]
+    constrs += [model.addConstr(alpha[s] == T, name=f"alpha_{s}_S_minus_X") for s in S_minus_X]
+
+    return constrs + list(y_psi.values())
+
+
+def solve_cut_model(cut_model, T, S_plus_X, S_minus_X):
+    """
+    Solves a model from `build_cut_model` for the time horizon T and the terminal sets S+ ∩ X and S- \\ X.
+    The supersource arcs and terminal constraints are added for this solve only and removed again
+    afterwards (also if the solve fails), so the same model can serve any number of requests (one at a
+    time).
+
+    Returns:
+    - dict: The alpha-values of the min cut over time (without the auxiliary node psi), or None if
+      no optimal solution was found.
+    """
+    stats = get_instrumentation()
+    model, alpha = cut_model['model'], cut_model['alpha']
+
+    with stats.timer('min_cut.build'):
+        added = add_terminal_constraints(cut_model, T, S_plus_X, S_minus_X)
+
+    try:
+        # Start from scratch so the result does not depend on previously served requests
+        model.reset()
+
+        with stats.timer('min_cut.solve'):
+            model.optimize()
+        if stats.enabled:
+            stats.count('min_cut.solves')
+            stats.count('min_cut.lp_iterations', int(model.IterCount))
+
+        with stats.timer('min_cut.extract'):
+            alpha_dict = None
+            if model.status == GRB.OPTIMAL:
+                alpha_dict = {v: int(alpha[v].x) for v in alpha if v != 'psi'}
+    finally:
+        model.remove(added)
+        model.update()
+
+    return alpha_dict
+
+
 # # Parameters (these should be defined based on your data)
 # arcs = [(1, 2), (1, 3), (2, 4), (3, 4)]  # Arcs in the network
 # capacities = {(1, 2): 1, (1, 3): 2, (2, 4): 1, (3, 4): 1}  # Cost for each arc in the objective
@@ -0,0 +1,271 @@
+import zipfile
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_COLUMNS = {'tail': 'tail', 'head': 'head', 'capacity': 'capacity', 'transit_time': 'transit_time'}
+
+
+def arcs_from_dataframe(df, columns=None):
+    """
+    Converts an arc table into the arcs, capacities and transit times used by `min_cut_over_time`,
+    `aggregate_cut_time_points` and `create_graph`.
+
+    Parameters:
+    - df (pandas.DataFrame): Arc table with one row per arc.
+    - columns (dict): Optional mapping from 'tail', 'head', 'capacity' and 'transit_time' to the column
+      names in `df`. Missing keys fall back to `DEFAULT_COLUMNS`.
+
+    Returns:
+    tuple: A tuple containing:
+        - arcs (list): List of arc tuples (v, w).
+        - capacities (dict): Dictionary with arc tuples as keys and capacities as values.
+        - transit_times (dict): Dictionary with arc tuples as keys and transit times as values.
+    """
+    cols = {**DEFAULT_COLUMNS, **(columns or {})}
+
+    # Pull whole columns at once instead of iterating over rows
+    tails = df[cols['tail']].to_numpy().tolist()
+    heads = df[cols['head']].to_numpy().tolist()
+    caps = df[cols['capacity']].to_numpy().tolist()
+    taus = df[cols['transit_time']].to_numpy().tolist()
+
+    arcs = list(zip(tails, heads))
+    capacities = dict(zip(arcs, caps))
+    transit_times = dict(zip(arcs, taus))
+
+    # Arcs are used as dictionary keys throughout, so parallel arcs cannot be represented
+    if len(capacities) != len(arcs):
+        raise ValueError("The arc table contains parallel arcs (duplicate (tail, head) pairs).")
+
+    return arcs, capacities, transit_times
+
+
+def load_arcs_csv(path, columns=None, chunksize=None, **read_csv_kwargs):
+    """
+    Reads an arc table from a CSV file.
+
+    Parameters:
+    - path (str): Path to the CSV file.
+    - columns (dict): Optional column name mapping, see `arcs_from_dataframe`.
+    - chunksize (int): If given, the file is read in chunks of this many rows to bound peak memory.
+    - read_csv_kwargs: Passed on to `pandas.read_csv` (e.g. `sep`, `dtype`).
+
+    Returns:
+    tuple: (arcs, capacities, transit_times), see `arcs_from_dataframe`.
+    """
+    cols = {**DEFAULT_COLUMNS, **(columns or {})}
+    usecols = [cols['tail'], cols['head'], cols['capacity'], cols['transit_time']]
+
+    if chunksize is None:
+        df = pd.read_csv(path, usecols=usecols, **read_csv_kwargs)
+        return arcs_from_dataframe(df, cols)
+
+    arcs, capacities, transit_times = [], {}, {}
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, **read_csv_kwargs):
+        chunk_arcs, chunk_capacities, chunk_transit_times = arcs_from_dataframe(chunk, cols)
+        arcs += chunk_arcs
+        capacities.update(chunk_capacities)
+        transit_times.update(chunk_transit_times)
+
+    # Duplicates can span two chunks, so check again on the merged result
+    if len(capacities) != len(arcs):
+        raise ValueError("The arc table contains parallel arcs (duplicate (tail, head) pairs).")
+
+    return arcs, capacities, transit_times
+
+
+def load_arcs_parquet(path, columns=None, batch_size=None):
+    """
+    Reads an arc table from a Parquet file. Requires pyarrow (or fastparquet) to be installed.
+
+    Parameters:
+    - path (str): Path to the Parquet file.
+    - columns (dict): Optional column name mapping, see `arcs_from_dataframe`.
+    - batch_size (int): If given, the file is read in record batches of this many rows (pyarrow only).
+
+    Returns:
+    tuple: (arcs, capacities, transit_times), see `arcs_from_dataframe`.
+    """
+    cols = {**DEFAULT_COLUMNS, **(columns or {})}
+    usecols = [cols['tail'], cols['head'], cols['capacity'], cols['transit_time']]
+
+    if batch_size is None:
+        df = pd.read_parquet(path, columns=usecols)
+        return arcs_from_dataframe(df, cols)
+
+    import pyarrow.parquet as pq
+
+    arcs, capacities, transit_times = [], {}, {}
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=usecols):
+        batch_arcs, batch_capacities, batch_transit_times = arcs_from_dataframe(batch.to_pandas(), cols)
+        arcs += batch_arcs
+        capacities.update(batch_capacities)
+        transit_times.update(batch_transit_times)
+
+    if len(capacities) != len(arcs):
+        raise ValueError("The arc table contains parallel arcs (duplicate (tail, head) pairs).")
+
+    return arcs, capacities, transit_times
+
+
+def _node_array(nodes):
+    """
+    Returns the node labels as an array that can be memory mapped (integers or fixed-width strings).
+    Labels of any other kind (mixed types, tuples, floats, ...) would not load back unchanged and are
+    rejected.
+    """
+    if all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in nodes):
+        return np.asarray(nodes, dtype=np.int64)
+    if all(isinstance(v, str) for v in nodes):
+        return np.asarray(nodes, dtype=str)
+    raise ValueError("Node labels must be either all integers or all strings to be stored in an .npz instance.")
+
+
+def _npz_path(path):
+    # numpy.savez appends '.npz' to paths without it, so the loader has to do the same
+    path = str(path)
+    return path if path.endswith('.npz') else path + '.npz'
+
+
+def save_instance_npz(path, arcs, capacities, transit_times, sources, sinks, time_horizon, supplies=None):
+    """
+    Saves a complete instance (network, terminals, supplies and time horizon) to a single `.npz` file.
+
+    Nodes are stored once and arcs as integer indices into the node array. The archive is written
+    uncompressed so that `load_instance_npz` can memory map its members. Node labels must be either all
+    integers or all strings.
+
+    Parameters:
+    - path (str): Target file; '.npz' is appended if missing (as `numpy.savez` does).
+    - arcs (list): List of arc tuples (v, w).
+    - capacities (dict): Capacity for each arc.
+    - transit_times (dict): Transit time for each arc.
+    - sources (list): Source nodes (S+).
+    - sinks (list): Sink nodes (S-).
+    - time_horizon (int): The time horizon T.
+    - supplies (dict): Optional supply/demand value per node; nodes not listed get 0.
+    """
+    # Collect the nodes in order of first appearance
+    nodes = list(dict.fromkeys([v for a in arcs for v in a] + list(sources) + list(sinks)))
+    node_array = _node_array(nodes)
+    index = {v: i for i, v in enumerate(nodes)}
+
+    supply_values = np.zeros(len(nodes))
+    for v, b in (supplies or {}).items():
+        supply_values[index[v]] = b
+
+    np.savez(
+        _npz_path(path),
+        nodes=node_array,
+        tails=np.fromiter((index[v] for v, _ in arcs), dtype=np.int64, count=len(arcs)),
+        heads=np.fromiter((index[w] for _, w in arcs), dtype=np.int64, count=len(arcs)),
+        capacities=np.asarray([capacities[a] for a in arcs]),
+        transit_times=np.asarray([transit_times[a] for a in arcs]),
+        sources=np.asarray([index[s] for s in sources], dtype=np.int64),
+        sinks=np.asarray([index[s] for s in sinks], dtype=np.int64),
+        supplies=supply_values,
+        time_horizon=np.asarray(time_horizon),
+    )
+
+
+def _mmap_npz(path):
+    """
+    Memory maps every member of an uncompressed `.npz` archive. `numpy.load` ignores `mmap_mode`
+    for archives, so the offset of each stored `.npy` member is located by hand.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Member {info.filename} of {path} is compressed and cannot be memory mapped.")
+
+            # Skip the local file header (30 bytes + file name + extra field)
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+
+            # Parse the .npy header to find dtype, shape and the start of the data
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            key = info.filename[:-len('.npy')]
+            if dtype.hasobject:
+                raise ValueError(f"Member {key} of {path} holds Python objects and cannot be memory mapped.")
+            if np.prod(shape) == 0:
+                # mmap cannot map zero bytes (e.g. an empty list of sinks)
+                arrays[key] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[key] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                    order='F' if fortran_order else 'C')
+    return arrays
+
+
+def load_instance_npz(path, mmap=True):
+    """
+    Loads an instance written by `save_instance_npz`.
+
+    Only the node labels, terminals, supplies and time horizon are turned into Python objects. The arc
+    arrays are returned as they are (memory mapped if `mmap` is True, so they are only read from disk
+    when accessed); `network_from_instance` builds the arcs, capacities and transit times from them.
+
+    Parameters:
+    - path (str): Path to the `.npz` file; '.npz' is appended if missing, as in `save_instance_npz`.
+    - mmap (bool): Memory map the arrays instead of reading them into memory.
+
+    Returns:
+    dict: A dictionary with the keys
+        - 'nodes' (list): the node labels; arcs and terminals are stored as indices into this list.
+        - 'sources' (list), 'sinks' (list): the terminals S+ and S-.
+        - 'supplies' (dict): supply value per node.
+        - 'time_horizon' (int): the time horizon T.
+        - 'arrays' (dict): the raw (possibly memory mapped) arrays as stored in the file.
+    """
+    path = _npz_path(path)
+    if mmap:
+        arrays = _mmap_npz(path)
+    else:
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+
+    nodes = arrays['nodes'].tolist()
+
+    return {
+        'nodes': nodes,
+        'sources': [nodes[i] for i in arrays['sources'].tolist()],
+        'sinks': [nodes[i] for i in arrays['sinks'].tolist()],
+        'supplies': dict(zip(nodes, arrays['supplies'].tolist())),
+        'time_horizon': arrays['time_horizon'].item(),
+        'arrays': arrays,
+    }
+
+
+def network_from_instance(instance):
+    """
+    Builds the network of an instance from `load_instance_npz` in the form used by `min_cut_over_time`
+    and `aggregate_cut_time_points`.
+
+    Returns:
+    tuple: (arcs, capacities, transit_times), see `arcs_from_dataframe`.
+    """
+    nodes, arrays = instance['nodes'], instance['arrays']
+    tails = [nodes[i] for i in arrays['tails'].tolist()]
+    heads = [nodes[i] for i in arrays['heads'].tolist()]
+
+    arcs = list(zip(tails, heads))
+    capacities = dict(zip(arcs, arrays['capacities'].tolist()))
+    transit_times = dict(zip(arcs, arrays['transit_times'].tolist()))
+
+    return arcs, capacities, transit_times
+
+
+# # Example usage
+# arcs, capacities, transit_times = load_arcs_csv('arcs.csv', chunksize=100000)
+# save_instance_npz('instance.npz', arcs, capacities, transit_times, sources=[1], sinks=[4], time_horizon=4)
+
+# instance = load_instance_npz('instance.npz')
+# arcs, capacities, transit_times = network_from_instance(instance)
+# time_points = aggregate_cut_time_points(instance['sources'], instance['sinks'], arcs, capacities, transit_times,
+#                                         instance['time_horizon'])
@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from gurobipy import GRB
+
+from auxiliary_functions.min_cut_LP import build_cut_model, add_terminal_constraints
+from auxiliary_functions.generalized_ext_network import all_valid_subsets
+from auxiliary_functions.instrumentation import get_instrumentation
+
+
+def _solve_scenario_chunk(sources, sinks, arcs, capacities, transit_times, time_horizon, subsets, warm_start):
+    """
+    Solves a contiguous block of scenarios (rows of `capacities` and `transit_times`).
+
+    One model is built for the whole block. For each terminal subset X the supersource arcs and terminal
+    constraints are added (see `add_terminal_constraints`) and the scenarios are solved one after the other
+    by only changing the objective coefficients (capacities) and right-hand sides (transit times); then the
+    terminal constraints are removed again for the next subset. With `warm_start` every solve starts from
+    the optimal basis of the previous one, otherwise each scenario is solved from scratch.
+
+    Returns:
+    tuple: A tuple containing:
+        - alpha (numpy.ndarray): scenarios × nodes alpha-values for X = S+ (-1 if not solved to optimality).
+        - time_points (list): For every scenario, the set of time points over all subsets X.
+    """
+    stats = get_instrumentation()
+
+    nodes = list(dict.fromkeys(v for a in arcs for v in a))
+    num_scenarios = len(capacities)
+    alpha_values = np.full((num_scenarios, len(nodes)), -1, dtype=np.int64)
+    time_points = [set() for _ in range(num_scenarios)]
+
+    # The model structure is shared by all scenarios and subsets of this block
+    cut_model = build_cut_model(arcs, dict(zip(arcs, capacities[0].tolist())),
+                                dict(zip(arcs, transit_times[0].tolist())))
+    model, alpha = cut_model['model'], cut_model['alpha']
+    y = [cut_model['y'][a] for a in arcs]
+    constrs = [cut_model['constrs'][a] for a in arcs]
+    model.Params.OutputFlag = 0
+
+    for X in subsets:
+        S_plus_X = [s for s in sources if s in X]
+        S_minus_X = [s for s in sinks if s not in X]
+
+        with stats.timer('min_cut.build'):
+            added = add_terminal_constraints(cut_model, time_horizon, S_plus_X, S_minus_X)
+
+        for i in range(num_scenarios):
+            model.setAttr('Obj', y, capacities[i].tolist())
+            model.setAttr('RHS', constrs, (-transit_times[i]).tolist())
+            if not warm_start:
+                model.reset()
+
+            with stats.timer('min_cut.solve'):
+                model.optimize()
+            if stats.enabled:
+                stats.count('min_cut.solves')
+                stats.count('min_cut.lp_iterations', int(model.IterCount))
+
+            if model.status != GRB.OPTIMAL:
+                continue
+
+            alpha_dict = {v: int(alpha[v].x) for v in nodes}
+            time_points[i] |= set(alpha_dict.values())
+            if S_plus_X == list(sources) and S_minus_X == list(sinks):
+                alpha_values[i] = [alpha_dict[v] for v in nodes]
+
+        model.remove(added)
+        model.update()
+
+    model.dispose()
+
+    return alpha_values, time_points
+
+
+def solve_scenario_batch(sources, sinks, arcs, capacities, transit_times, time_horizon, workers=1, warm_start=False):
+    """
+    Evaluates one topology under many capacity and transit time scenarios. For every scenario it computes
+    the alpha-values of the min cut over time for X = S+ (as `min_cut_over_time` with S+ and S-) and the
+    time points T~ (as `aggregate_cut_time_points`).
+
+    The terminal subsets are enumerated once and every worker builds a single model, which it reuses for all
+    subsets and its block of scenarios (see `_solve_scenario_chunk`). By default every scenario is solved
+    from scratch, which reproduces the results of separate calls. With `warm_start` each solve starts from
+    the basis of the previous scenario in the same block, which is faster for neighboring scenarios. If
+    the LP has several optimal solutions, a warm started solve may then return a different one (with the
+    same cut value), so alpha and T~ can differ from separate calls and also depend on `workers`, which
+    decides how the scenarios are split into blocks.
+
+    Parameters:
+    - sources (list): Source nodes (S+).
+    - sinks (list): Sink nodes (S-).
+    - arcs (list): List of arc tuples (v, w); defines the column order of the scenario matrices.
+    - capacities (array-like): scenarios × arcs matrix of capacities.
+    - transit_times (array-like): scenarios × arcs matrix of transit times.
+    - time_horizon (int): The time horizon T.
+    - workers (int): Number of worker processes; scenarios are split into contiguous blocks.
+    - warm_start (bool): Start each solve from the previous scenario's basis (see above).
+
+    Returns:
+    dict: A dictionary with the keys
+        - 'nodes' (list): Node order of the columns of 'alpha'.
+        - 'alpha' (numpy.ndarray): scenarios × nodes alpha-values (-1 where no optimal solution was found).
+        - 'time_points' (numpy.ndarray): scenarios × (max time point + 1) boolean matrix; T~ of scenario i
+          is `numpy.flatnonzero(time_points[i])`.
+    """
+    capacities = np.asarray(capacities)
+    transit_times = np.asarray(transit_times)
+    if capacities.ndim != 2 or capacities.shape != transit_times.shape or capacities.shape[1] != len(arcs):
+        raise ValueError("capacities and transit_times must both be scenarios × arcs matrices.")
+
+    nodes = list(dict.fromkeys(v for a in arcs for v in a))
+    subsets = all_valid_subsets(sources, sinks)
+
+    if workers <= 1:
+        alpha_values, time_points = _solve_scenario_chunk(sources, sinks, arcs, capacities, transit_times,
+                                                          time_horizon, subsets, warm_start)
+    else:
+        blocks = [b for b in np.array_split(np.arange(len(capacities)), workers) if len(b)]
+        with ProcessPoolExecutor(max_workers=len(blocks)) as executor:
+            results = list(executor.map(_solve_scenario_chunk,
+                                        *zip(*[(sources, sinks, arcs, capacities[b], transit_times[b],
+                                                time_horizon, subsets, warm_start) for b in blocks])))
+        alpha_values = np.concatenate([r[0] for r in results])
+        time_points = [t for r in results for t in r[1]]
+
+    width = max([time_horizon] + [max(t) for t in time_points if t]) + 1
+    time_point_mask = np.zeros((len(time_points), width), dtype=bool)
+    for i, t in enumerate(time_points):
+        time_point_mask[i, sorted(t)] = True
+
+    return {'nodes': nodes, 'alpha': alpha_values, 'time_points': time_point_mask}
+
+
+# # Example usage: 100 scenarios with capacities perturbed by up to ±1
+# rng = np.random.default_rng(0)
+# base_capacities = np.array([capacities[a] for a in arcs])
+# base_transit_times = np.array([transit_times[a] for a in arcs])
+# scenario_capacities = np.maximum(base_capacities + rng.integers(-1, 2, size=(100, len(arcs))), 0)
+# scenario_transit_times = np.tile(base_transit_times, (100, 1))
+# result = solve_scenario_batch(sources, sinks, arcs, scenario_capacities, scenario_transit_times, time_horizon, workers=4)
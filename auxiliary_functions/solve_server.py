@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from gurobipy import Env
+from auxiliary_functions.min_cut_LP import build_cut_model, solve_cut_model, get_env
+
+# Protocol: one JSON object per line in both directions.
+#   {"op": "register", "network": name, "arcs": [[v, w], ...], "capacities": [...], "transit_times": [...]}
+#   {"op": "min_cut", "network": name, "T": T, "S_plus_X": [...], "S_minus_X": [...]}
+#   {"op": "ping"}
+# Every reply contains "ok"; failed requests carry an "error" message. min_cut replies contain "alpha"
+# as a list of [node, value] pairs so that integer node labels survive the JSON round trip.
+
+
+def _network_from_message(message):
+    arcs = [tuple(a) for a in message['arcs']]
+    capacities = dict(zip(arcs, message['capacities']))
+    transit_times = dict(zip(arcs, message['transit_times']))
+    return arcs, capacities, transit_times
+
+
+def _network_to_message(arcs, capacities, transit_times):
+    return {'arcs': [list(a) for a in arcs],
+            'capacities': [capacities[a] for a in arcs],
+            'transit_times': [transit_times[a] for a in arcs]}
+
+
+class SolveServer:
+    """
+    Long-lived local solve service. It keeps `workers` warm Gurobi environments, each holding a prebuilt
+    model (see `build_cut_model`) for every registered network, and answers min-cut requests from any
+    number of clients concurrently over a Unix socket.
+
+    Gurobi environments are not thread-safe, so every environment is used by at most one request at a time;
+    requests wait in line for a free environment and are then solved in a worker thread. A request never
+    holds more than one environment: an environment builds its model of a network when it first serves
+    that network (or after the network was re-registered).
+    """
+
+    def __init__(self, path, workers=2):
+        self.path = path
+        self.workers = workers
+        self.networks = {}  # name -> (version, arcs, capacities, transit_times)
+        self._version = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = None
+        self._server = None
+
+    async def start(self):
+        # Each slot is one environment with its prebuilt models (network name -> (version, model))
+        self._slots = asyncio.Queue()
+        for _ in range(self.workers):
+            env = Env(empty=True)
+            env.setParam('OutputFlag', 0)
+            env.start()
+            self._slots.put_nowait({'env': env, 'models': {}})
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        while self._slots is not None and not self._slots.empty():
+            slot = self._slots.get_nowait()
+            for _, cut_model in slot['models'].values():
+                cut_model['model'].dispose()
+            slot['env'].dispose()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self._dispatch(json.loads(line))
+                except Exception as e:
+                    reply = {'ok': False, 'error': repr(e)}
+                writer.write((json.dumps(reply) + '\n').encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, message):
+        op = message.get('op')
+        if op == 'ping':
+            return {'ok': True}
+        if op == 'register':
+            await self.register(message['network'], *_network_from_message(message))
+            return {'ok': True}
+        if op == 'min_cut':
+            alpha = await self.min_cut(message['network'], message['T'], message['S_plus_X'], message['S_minus_X'])
+            return {'ok': alpha is not None, 'alpha': None if alpha is None else [[v, a] for v, a in alpha.items()]}
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _run(self, function, *args):
+        # Borrow a free environment, run the (blocking) Gurobi call in a thread and give it back
+        slot = await self._slots.get()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, slot, *args)
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def register(self, name, arcs, capacities, transit_times):
+        """
+        Registers (or replaces) a network and prebuilds its model in the next free environment. The other
+        environments build theirs when they first serve the network.
+        """
+        self._version += 1
+        self.networks[name] = (self._version, arcs, capacities, transit_times)
+        await self._run(self._model, name)
+
+    def _model(self, slot, name):
+        # Returns the slot's model of the network, (re)building it if missing or outdated
+        version, arcs, capacities, transit_times = self.networks[name]
+        built_version, cut_model = slot['models'].get(name, (None, None))
+        if built_version != version:
+            if cut_model is not None:
+                cut_model['model'].dispose()
+            cut_model = build_cut_model(arcs, capacities, transit_times, env=slot['env'])
+            slot['models'][name] = (version, cut_model)
+        return cut_model
+
+    async def min_cut(self, name, T, S_plus_X, S_minus_X):
+        if name not in self.networks:
+            raise KeyError(f"Network {name!r} is not registered.")
+        return await self._run(self._solve, name, T, S_plus_X, S_minus_X)
+
+    def _solve(self, slot, name, T, S_plus_X, S_minus_X):
+        return solve_cut_model(self._model(slot, name), T, S_plus_X, S_minus_X)
+
+
+class SolveClient:
+    """
+    Blocking client for a `SolveServer`. Short-lived processes can use it instead of building and
+    solving their own models.
+    """
+
+    def __init__(self, path, timeout=None):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._file = self._sock.makefile('rwb')
+
+    def _request(self, message):
+        self._file.write((json.dumps(message) + '\n').encode())
+        self._file.flush()
+        reply = json.loads(self._file.readline())
+        if 'error' in reply:
+            raise RuntimeError(f"Solve server error: {reply['error']}")
+        return reply
+
+    def ping(self):
+        return self._request({'op': 'ping'})['ok']
+
+    def register(self, name, arcs, capacities, transit_times):
+        self._request({'op': 'register', 'network': name, **_network_to_message(arcs, capacities, transit_times)})
+
+    def min_cut(self, name, T, S_plus_X, S_minus_X):
+        """
+        Returns the alpha-values of the min cut over time, like the first return value of
+        `min_cut_over_time`, or None if no optimal solution was found.
+        """
+        reply = self._request({'op': 'min_cut', 'network': name, 'T': T,
+                               'S_plus_X': list(S_plus_X), 'S_minus_X': list(S_minus_X)})
+        return None if reply['alpha'] is None else {v: a for v, a in reply['alpha']}
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalSolveClient:
+    """
+    In-process stand-in for `SolveClient` with the same interface. It solves on the shared environment of
+    the current process, which is convenient for testing and for runs where no server is available.
+    """
+
+    def __init__(self):
+        self.models = {}
+
+    def ping(self):
+        return True
+
+    def register(self, name, arcs, capacities, transit_times):
+        self.models[name] = build_cut_model(arcs, capacities, transit_times, env=get_env())
+
+    def min_cut(self, name, T, S_plus_X, S_minus_X):
+        return solve_cut_model(self.models[name], T, S_plus_X, S_minus_X)
+
+    def close(self):
+        self.models = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local min-cut-over-time solve server.")
+    parser.add_argument('socket', help="Path of the Unix socket to listen on.")
+    parser.add_argument('-j', '--workers', type=int, default=2, help="Number of warm Gurobi environments.")
+    args = parser.parse_args(argv)
+
+    server = SolveServer(args.socket, workers=args.workers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+
+# # Example usage (server: python -m auxiliary_functions.solve_server /tmp/min_cut.sock)
+# with SolveClient('/tmp/min_cut.sock') as client:
+#     client.register('example', arcs, capacities, transit_times)
+#     alpha = client.min_cut('example', time_horizon, S_plus_X, S_minus_X)
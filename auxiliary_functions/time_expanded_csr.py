@@ -0,0 +1,417 @@
+import json
+import os
+import tempfile
+import numpy as np
+
+from auxiliary_functions.instrumentation import get_instrumentation
+
+# On-disk layout of an expansion written by `write_time_expanded_csr` (one directory):
+#   meta.json                  node labels, time horizon, slab size and arc offsets of the slabs
+#   slab_<k>_<name>.npy        arrays of time slab k, each holding `slab_size` consecutive time steps
+# The copy of node v at time t has the global index t * n + i (i = position of v in the node list).
+# Per slab, the CSR arrays `offsets`, `heads`, `capacities` and `costs` describe the arcs leaving its
+# nodes (offsets are local to the slab, heads are global node indices). The reverse index `rev_offsets`,
+# `rev_arcs` (global arc ids) and `rev_tails` lists the arcs entering its nodes.
+
+SLAB_ARRAYS = ('offsets', 'heads', 'capacities', 'costs', 'rev_offsets', 'rev_arcs', 'rev_tails')
+
+
+def _slab_file(path, k, name):
+    return os.path.join(path, f'slab_{k:05d}_{name}.npy')
+
+
+def _layer_arcs(tails, heads, capacities, transit_times, n, t, T, holdover_capacity):
+    """
+    Returns the arcs leaving time step t, sorted by tail (movement arcs before the holdover arc).
+    """
+    mask = t + transit_times < T
+    layer_tails = tails[mask]
+    layer_heads = heads[mask] + (t + transit_times[mask]) * n
+    layer_caps = capacities[mask]
+    layer_costs = transit_times[mask]
+
+    # Waiting arcs allow staying at a node from t to t + 1
+    if t + 1 < T:
+        nodes = np.arange(n)
+        layer_tails = np.concatenate([layer_tails, nodes])
+        layer_heads = np.concatenate([layer_heads, nodes + (t + 1) * n])
+        layer_caps = np.concatenate([layer_caps, np.full(n, holdover_capacity, dtype=float)])
+        layer_costs = np.concatenate([layer_costs, np.ones(n, dtype=np.int64)])
+
+    order = np.argsort(layer_tails, kind='stable')
+    return layer_tails[order], layer_heads[order], layer_caps[order], layer_costs[order]
+
+
+def write_time_expanded_csr(path, arcs, capacities, transit_times, T, slab_size=64, holdover_capacity=10000):
+    """
+    Writes the time-expanded network of (arcs, capacities, transit_times) with time horizon T to memory
+    mappable CSR files, one time slab at a time, so only a single slab is ever held in memory.
+
+    Compared to `create_time_expanded_network`, arcs respect their transit times: arc (v, w) connects
+    (v, t) with (w, t + τ) whenever t + τ < T. Costs are the number of time steps an arc spans.
+
+    Parameters:
+    - path (str): Directory to write to (created if necessary).
+    - arcs (list): List of arc tuples (v, w). Node labels must be JSON serializable (ints or strings).
+    - capacities (dict): Capacity for each arc.
+    - transit_times (dict): Non-negative integer transit time for each arc.
+    - T (int): The time horizon (number of time steps).
+    - slab_size (int): Number of time steps per slab.
+    - holdover_capacity (float): Capacity of the waiting arcs (default 10000, i.e. "infinity").
+
+    Returns:
+    - dict: The metadata of the expansion, as returned by `open_time_expanded_csr`.
+    """
+    stats = get_instrumentation()
+
+    with stats.timer('network.time_expanded_csr'):
+        os.makedirs(path, exist_ok=True)
+
+        nodes = list(dict.fromkeys(v for a in arcs for v in a))
+        index = {v: i for i, v in enumerate(nodes)}
+        n = len(nodes)
+
+        tails = np.fromiter((index[v] for v, _ in arcs), dtype=np.int64, count=len(arcs))
+        heads = np.fromiter((index[w] for _, w in arcs), dtype=np.int64, count=len(arcs))
+        caps = np.asarray([capacities[a] for a in arcs], dtype=float)
+        taus = np.asarray([transit_times[a] for a in arcs], dtype=np.int64)
+        if (taus < 0).any():
+            raise ValueError("The time-expanded network requires non-negative transit times.")
+
+        max_transit_time = max(int(taus.max()) if len(taus) else 0, 1)
+        num_slabs = -(-T // slab_size)
+        arc_starts = [0]
+
+        # Forward CSR, slab by slab
+        for k in range(num_slabs):
+            layers = [_layer_arcs(tails, heads, caps, taus, n, t, T, holdover_capacity)
+                      for t in range(k * slab_size, min((k + 1) * slab_size, T))]
+
+            # Tails are sorted within each layer and layers are consecutive, so counting gives the offsets
+            local_tails = np.concatenate([l[0] + i * n for i, l in enumerate(layers)])
+            offsets = np.zeros(len(layers) * n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(local_tails, minlength=len(layers) * n), out=offsets[1:])
+
+            np.save(_slab_file(path, k, 'offsets'), offsets)
+            np.save(_slab_file(path, k, 'heads'), np.concatenate([l[1] for l in layers]))
+            np.save(_slab_file(path, k, 'capacities'), np.concatenate([l[2] for l in layers]))
+            np.save(_slab_file(path, k, 'costs'), np.concatenate([l[3] for l in layers]))
+            arc_starts.append(arc_starts[-1] + len(local_tails))
+
+        # Reverse index: arcs entering slab k leave from at most max_transit_time steps earlier
+        for k in range(num_slabs):
+            node_start = k * slab_size * n
+            node_end = min((k + 1) * slab_size, T) * n
+            first = max(0, (k * slab_size - max_transit_time) // slab_size)
+
+            rev_heads, rev_arcs, rev_tails = [], [], []
+            for j in range(first, k + 1):
+                offsets_j = np.load(_slab_file(path, j, 'offsets'), mmap_mode='r')
+                heads_j = np.load(_slab_file(path, j, 'heads'), mmap_mode='r')
+                mask = (heads_j >= node_start) & (heads_j < node_end)
+                local_ids = np.flatnonzero(mask)
+                tails_j = np.repeat(np.arange(len(offsets_j) - 1), np.diff(offsets_j))[local_ids]
+
+                rev_heads.append(heads_j[local_ids] - node_start)
+                rev_arcs.append(local_ids + arc_starts[j])
+                rev_tails.append(tails_j + j * slab_size * n)
+
+            rev_heads = np.concatenate(rev_heads)
+            order = np.argsort(rev_heads, kind='stable')
+            rev_offsets = np.zeros(node_end - node_start + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rev_heads, minlength=node_end - node_start), out=rev_offsets[1:])
+
+            np.save(_slab_file(path, k, 'rev_offsets'), rev_offsets)
+            np.save(_slab_file(path, k, 'rev_arcs'), np.concatenate(rev_arcs)[order])
+            np.save(_slab_file(path, k, 'rev_tails'), np.concatenate(rev_tails)[order])
+
+        meta = {'nodes': nodes, 'T': T, 'slab_size': slab_size, 'num_slabs': num_slabs,
+                'arc_starts': arc_starts, 'max_transit_time': max_transit_time}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    stats.count('network.time_expanded_nodes', n * T)
+    stats.count('network.time_expanded_arcs', arc_starts[-1])
+
+    return open_time_expanded_csr(path)
+
+
+def open_time_expanded_csr(path):
+    """
+    Reads the metadata of an expansion written by `write_time_expanded_csr`. Any number of processes can
+    open the same expansion; the slab arrays are only ever memory mapped read-only.
+
+    Returns:
+    - dict: 'path', 'nodes', 'n', 'T', 'slab_size', 'num_slabs', 'arc_starts' and 'max_transit_time'.
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    meta['path'] = path
+    meta['n'] = len(meta['nodes'])
+    return meta
+
+
+def load_time_slab(meta, k):
+    """
+    Memory maps time slab k of an expansion.
+
+    Returns:
+    - dict: The slab arrays (see SLAB_ARRAYS) together with 't_start', 't_end', 'node_start' and 'arc_start'.
+    """
+    slab = {name: np.load(_slab_file(meta['path'], k, name), mmap_mode='r') for name in SLAB_ARRAYS}
+    slab['t_start'] = k * meta['slab_size']
+    slab['t_end'] = min((k + 1) * meta['slab_size'], meta['T'])
+    slab['node_start'] = slab['t_start'] * meta['n']
+    slab['arc_start'] = meta['arc_starts'][k]
+    return slab
+
+
+def iter_time_slabs(meta):
+    """
+    Yields the time slabs of an expansion in chronological order, one memory mapped slab at a time.
+    """
+    for k in range(meta['num_slabs']):
+        yield load_time_slab(meta, k)
+
+
+def earliest_arrival_times(meta, sources):
+    """
+    Computes for every node the earliest time step at which it can be reached from the sources (leaving at
+    time 0) along arcs of positive capacity, streaming over the time slabs. Besides the current slab, only
+    the arrivals scheduled for the next `max_transit_time` time steps are kept in memory.
+
+    Parameters:
+    - meta (dict): Expansion as returned by `open_time_expanded_csr`.
+    - sources (list): Source nodes.
+
+    Returns:
+    - dict: Earliest arrival time per node, or None if the node cannot be reached within the horizon.
+    """
+    n, nodes = meta['n'], meta['nodes']
+    index = {v: i for i, v in enumerate(nodes)}
+
+    earliest = np.full(n, -1, dtype=np.int64)
+    reached = np.zeros(n, dtype=bool)
+    reached[[index[s] for s in sources]] = True
+    pending = {}  # time step -> nodes reached at that time step by arcs from earlier time steps
+
+    for slab in iter_time_slabs(meta):
+        offsets, heads, caps = slab['offsets'], slab['heads'], slab['capacities']
+        for t in range(slab['t_start'], slab['t_end']):
+            if t in pending:
+                reached |= pending.pop(t)
+
+            layer = t - slab['t_start']
+            arc_lo, arc_hi = offsets[layer * n], offsets[(layer + 1) * n]
+            counts = np.diff(offsets[layer * n:(layer + 1) * n + 1])
+            layer_heads = np.asarray(heads[arc_lo:arc_hi])
+            usable = np.asarray(caps[arc_lo:arc_hi]) > 0
+            head_times, head_nodes = np.divmod(layer_heads, n)
+
+            # Arcs with transit time 0 stay within the time step, so close the reached set over them first
+            while True:
+                active = np.repeat(reached, counts) & usable
+                same_layer = head_nodes[active & (head_times == t)]
+                if reached[same_layer].all():
+                    break
+                reached[same_layer] = True
+
+            earliest[(earliest < 0) & reached] = t
+
+            active = np.repeat(reached, counts) & usable & (head_times > t)
+            for arrival in np.unique(head_times[active]):
+                if arrival not in pending:
+                    pending[arrival] = np.zeros(n, dtype=bool)
+                pending[arrival][head_nodes[active & (head_times == arrival)]] = True
+
+            # Only waiting arcs keep a node reached in the next time step
+            reached = np.zeros(n, dtype=bool) if t + 1 >= meta['T'] else \
+                _waiting_successors(reached, head_times, head_nodes, counts, usable, t, n)
+
+    return {v: (int(earliest[i]) if earliest[i] >= 0 else None) for i, v in enumerate(nodes)}
+
+
+def _waiting_successors(reached, head_times, head_nodes, counts, usable, t, n):
+    tails = np.repeat(np.arange(n), counts)
+    waiting = usable & (head_times == t + 1) & (head_nodes == tails)
+    successors = np.zeros(n, dtype=bool)
+    successors[head_nodes[waiting & reached[tails]]] = True
+    return successors
+
+
+def _expand_ranges(starts, ends):
+    """
+    Returns, for the index ranges [starts[i], ends[i]), the position i of the range each index belongs to
+    and the concatenated indices themselves.
+    """
+    lengths = np.asarray(ends, dtype=np.int64) - starts
+    owners = np.repeat(np.arange(len(lengths)), lengths)
+    indices = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+    return owners, indices
+
+
+def _arc_capacities(meta, slabs, arcs):
+    # Capacities of arcs given by their global ids
+    slab_ids = np.searchsorted(meta['arc_starts'], arcs, side='right') - 1
+    capacities = np.empty(len(arcs))
+    for k in np.unique(slab_ids):
+        mask = slab_ids == k
+        capacities[mask] = slabs[k]['capacities'][arcs[mask] - meta['arc_starts'][k]]
+    return capacities
+
+
+def max_flow_over_time(meta, sources, sinks, work_dir=None):
+    """
+    Computes the value of a maximum flow over time from the sources to the sinks within the time horizon,
+    i.e. a maximum flow in the time-expanded network from the source copies at time 0 to the sink copies
+    at time T - 1 (waiting arcs carry flow that departs later or arrives earlier).
+
+    Uses Dinic's algorithm. Each phase computes distance levels with a breadth-first search that advances
+    level by level and handles all frontier nodes of a time slab with array operations on the memory
+    mapped arcs, and then saturates the level graph with a depth-first search that keeps a current-arc
+    pointer per node. The flow values and the per-node labels (visit stamp, level and current arc) live in
+    memory mapped files in `work_dir`, so apart from the search frontier and the current path nothing of
+    the size of the expansion is kept in memory, and the expansion itself stays read-only and can be
+    shared between processes.
+
+    Parameters:
+    - meta (dict): Expansion as returned by `open_time_expanded_csr`.
+    - sources (list): Source nodes (S+).
+    - sinks (list): Sink nodes (S-).
+    - work_dir (str): Directory for the flow and label files (created if necessary and left in place).
+      By default a temporary directory is used and removed afterwards.
+
+    Returns:
+    - float: The value of the maximum flow over time.
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix='max_flow_over_time_') as work_dir:
+            return _max_flow_over_time(meta, sources, sinks, work_dir)
+
+    os.makedirs(work_dir, exist_ok=True)
+    return _max_flow_over_time(meta, sources, sinks, work_dir)
+
+
+def _max_flow_over_time(meta, sources, sinks, work_dir):
+    n, T = meta['n'], meta['T']
+    index = {v: i for i, v in enumerate(meta['nodes'])}
+    slab_nodes = meta['slab_size'] * n
+    # The search reads a few entries at a time, where indexing np.memmap objects costs far more than reading
+    # the data; plain ndarray views of the same mappings are just as lazy
+    slabs = [{name: (value.view(np.ndarray) if isinstance(value, np.memmap) else value)
+              for name, value in load_time_slab(meta, k).items()} for k in range(meta['num_slabs'])]
+
+    def work_file(name, dtype, size):
+        return np.lib.format.open_memmap(os.path.join(work_dir, f'{name}.npy'), mode='w+', dtype=dtype,
+                                         shape=(size,)).view(np.ndarray)
+
+    flow = work_file('flow', float, meta['arc_starts'][-1])
+    stamp = work_file('stamp', np.int32, n * T)  # phase whose level graph contains the node
+    level = work_file('level', np.int32, n * T)
+    current = work_file('current', np.int32, n * T)  # current-arc pointer, see residual_arcs
+
+    start_nodes = np.unique([index[s] for s in sources]).astype(np.int64)
+    targets = np.unique([(T - 1) * n + index[s] for s in sinks]).astype(np.int64)
+    target_set = set(targets.tolist())
+
+    def admissible_arc(g, next_level):
+        # Scans the residual arcs of node g from its current arc on (forward arcs first, then backward arcs)
+        # and returns (position, head, arc) of the first one into the next level, or None. Arcs are encoded
+        # as e + 1 for forward and -(e + 1) for backward arcs. Nodes have few arcs, so they are read one at
+        # a time rather than as arrays.
+        slab = slabs[g // slab_nodes]
+        local = g - slab['node_start']
+        lo, hi = int(slab['offsets'][local]), int(slab['offsets'][local + 1])
+        rev_lo, rev_hi = int(slab['rev_offsets'][local]), int(slab['rev_offsets'][local + 1])
+        for position in range(int(current[g]), hi - lo + rev_hi - rev_lo):
+            if position < hi - lo:
+                i = lo + position
+                e = slab['arc_start'] + i
+                head, residual, arc = int(slab['heads'][i]), slab['capacities'][i] - flow[e], e + 1
+            else:
+                i = rev_lo + position - (hi - lo)
+                e = int(slab['rev_arcs'][i])
+                head, residual, arc = int(slab['rev_tails'][i]), flow[e], -(e + 1)
+            if residual > 0 and stamp[head] == phase and level[head] == next_level:
+                return position, head, arc
+        return None
+
+    value = 0.0
+    phase = 0
+    while True:
+        # Breadth-first search for the levels, one level at a time, until a target is reached
+        phase += 1
+        stamp[start_nodes] = phase
+        level[start_nodes] = 0
+        current[start_nodes] = 0
+        frontier = start_nodes
+        depth = 0
+
+        while len(frontier) and not np.isin(frontier, targets).any():
+            successors = []
+            slab_ids = frontier // slab_nodes
+            for k in np.unique(slab_ids):
+                slab = slabs[k]
+                local = frontier[slab_ids == k] - slab['node_start']
+
+                # Forward arcs with remaining capacity
+                _, positions = _expand_ranges(slab['offsets'][local], slab['offsets'][local + 1])
+                usable = np.asarray(slab['capacities'][positions]) - flow[positions + slab['arc_start']] > 0
+                successors.append(np.asarray(slab['heads'][positions])[usable])
+
+                # Backward arcs carrying flow
+                _, positions = _expand_ranges(slab['rev_offsets'][local], slab['rev_offsets'][local + 1])
+                usable = flow[np.asarray(slab['rev_arcs'][positions])] > 0
+                successors.append(np.asarray(slab['rev_tails'][positions])[usable])
+
+            successors = np.unique(np.concatenate(successors))
+            frontier = successors[stamp[successors] != phase]
+            depth += 1
+            stamp[frontier] = phase
+            level[frontier] = depth
+            current[frontier] = 0
+
+        if not len(frontier):
+            return value
+
+        # Blocking flow: depth-first search along the level graph from every source
+        for s in start_nodes.tolist():
+            path, path_arcs = [s], []
+            while path:
+                g = path[-1]
+                if g in target_set:
+                    arcs = np.asarray(path_arcs)
+                    is_forward = arcs > 0
+                    forward, backward = arcs[is_forward] - 1, -arcs[~is_forward] - 1
+                    residuals = np.empty(len(arcs))
+                    residuals[is_forward] = _arc_capacities(meta, slabs, forward) - flow[forward]
+                    residuals[~is_forward] = flow[backward]
+                    bottleneck = residuals.min()
+                    flow[forward] += bottleneck
+                    flow[backward] -= bottleneck
+                    value += float(bottleneck)
+
+                    # Continue from the tail of the first saturated arc
+                    saturated = int(np.argmax(residuals == bottleneck))
+                    del path[saturated + 1:], path_arcs[saturated:]
+                    continue
+
+                found = admissible_arc(g, level[g] + 1)
+                if found is not None:
+                    current[g], head, arc = found
+                    path.append(head)
+                    path_arcs.append(arc)
+                else:
+                    # Dead end: remove the node from this phase's level graph and step back
+                    stamp[g] = 0
+                    path.pop()
+                    if path_arcs:
+                        path_arcs.pop()
+
+
+# # Example usage
+# meta = write_time_expanded_csr('expansion', arcs, capacities, transit_times, T=100000, slab_size=1024)
+# for slab in iter_time_slabs(meta):
+#     print(slab['t_start'], slab['t_end'], len(slab['heads']))
+# print(earliest_arrival_times(meta, sources=[1]))
+# print(max_flow_over_time(meta, sources=[1], sinks=[4]))
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+from gurobipy import GRB, GurobiError
+from pandas.errors import ParserError
+from auxiliary_functions.network_io import load_arcs_csv, load_arcs_parquet, load_instance_npz, network_from_instance
+from auxiliary_functions.generalized_ext_network import aggregate_cut_time_points
+from auxiliary_functions.min_cut_LP import min_cut_over_time, get_env
+from auxiliary_functions.instrumentation import enable_instrumentation
+
+
+def iter_instances(source):
+    """
+    Yields the instances of a batch one at a time.
+
+    Parameters:
+    - source (str): Either a directory (every `*.npz` file in it is one instance) or a manifest file.
+      A manifest is a JSON list or a JSON Lines file of entries such as
+      {"id": "a", "path": "a.csv", "sources": [1], "sinks": [4], "time_horizon": 4}.
+      `path` may point to an `.npz`, `.csv` or `.parquet` file and is resolved relative to the manifest.
+      For `.npz` files, `sources`, `sinks` and `time_horizon` are optional and override the stored values.
+
+    Yields:
+    - dict: The manifest entry with an absolute `path` and an `id`.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith('.npz'):
+                yield {'id': name[:-len('.npz')], 'path': os.path.join(source, name)}
+        return
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        if source.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = (json.loads(line) for line in f if line.strip())
+
+        for entry in entries:
+            entry = dict(entry)
+            entry['path'] = os.path.join(base, entry['path'])
+            entry.setdefault('id', os.path.splitext(os.path.basename(entry['path']))[0])
+            yield entry
+
+
+def load_instance(entry):
+    """
+    Loads the network, terminals and time horizon of a manifest entry.
+
+    Returns:
+    tuple: (arcs, capacities, transit_times, sources, sinks, time_horizon)
+    """
+    path = entry['path']
+    if path.endswith('.npz'):
+        instance = load_instance_npz(path)
+        arcs, capacities, transit_times = network_from_instance(instance)
+        sources = entry.get('sources', instance['sources'])
+        sinks = entry.get('sinks', instance['sinks'])
+        time_horizon = entry.get('time_horizon', instance['time_horizon'])
+    else:
+        if path.endswith('.parquet'):
+            arcs, capacities, transit_times = load_arcs_parquet(path, columns=entry.get('columns'))
+        else:
+            arcs, capacities, transit_times = load_arcs_csv(path, columns=entry.get('columns'))
+        sources, sinks, time_horizon = entry['sources'], entry['sinks'], entry['time_horizon']
+
+    return arcs, capacities, transit_times, sources, sinks, time_horizon
+
+
+def _address_space_size():
+    """
+    Returns the current virtual memory size (VmSize) of this process in bytes, or 0 where /proc is missing.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmSize:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _is_out_of_memory(e):
+    """
+    Checks whether an exception raised under the memory limit is an allocation failure. pandas' C parser
+    and Gurobi do not raise MemoryError, so their out-of-memory errors are recognized separately.
+    """
+    while e is not None:
+        if isinstance(e, MemoryError):
+            return True
+        if isinstance(e, GurobiError) and e.errno == GRB.Error.OUT_OF_MEMORY:
+            return True
+        # pandas turns a failed allocation of its read buffer into a failed read of the source
+        if isinstance(e, ParserError) and ('out of memory' in str(e) or 'Calling read(nbytes) on source failed' in str(e)):
+            return True
+        e = e.__cause__ or e.__context__
+    return False
+
+
+def _run_instance(conn, entry, mode, memory_limit_mb, solver_threads=0):
+    """
+    Worker process: solves one instance and sends the result record through `conn`.
+    """
+    # The solver and min_cut_over_time print to stdout, which is reserved for the result stream
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+    if memory_limit_mb:
+        import resource
+        # The worker already maps the interpreter and the imported libraries; the limit comes on top of that
+        limit = _address_space_size() + memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    # Models inherit the thread count from the shared environment
+    if solver_threads:
+        get_env().setParam('Threads', solver_threads)
+
+    stats = enable_instrumentation()
+    record = {'id': entry['id'], 'path': entry['path']}
+    start = time.perf_counter()
+    try:
+        arcs, capacities, transit_times, sources, sinks, time_horizon = load_instance(entry)
+
+        if mode in ('aggregate', 'both'):
+            record['time_points'] = aggregate_cut_time_points(sources, sinks, arcs, capacities,
+                                                              transit_times, time_horizon)
+        if mode in ('min-cut', 'both'):
+            alpha, _ = min_cut_over_time(arcs, capacities, transit_times, time_horizon, sources, sinks)
+            record['alpha'] = {str(v): a for v, a in alpha.items()}
+
+        record['status'] = 'ok'
+    except Exception as e:
+        if memory_limit_mb and _is_out_of_memory(e):
+            record['status'] = 'memory_limit'
+        else:
+            record['status'] = 'error'
+        record['error'] = repr(e)
+
+    record['wall_s'] = time.perf_counter() - start
+    record['timings'] = stats.summary()
+    conn.send(record)
+    conn.close()
+
+
+def run_batch(instances, out, workers=1, mode='both', time_limit=None, memory_limit_mb=None, solver_threads=None):
+    """
+    Solves all instances with a pool of worker processes (one process per instance) and writes one
+    JSON line per instance to `out` as soon as it finishes.
+
+    Parameters:
+    - instances (iterable): Manifest entries, see `iter_instances`.
+    - out (file): Writable text stream for the JSON Lines results.
+    - workers (int): Number of instances solved in parallel.
+    - mode (str): 'aggregate' (T~ via `aggregate_cut_time_points`), 'min-cut' (alpha via
+      `min_cut_over_time` with X = S+) or 'both'.
+    - time_limit (float): Wall-clock limit per instance in seconds; the worker is killed when exceeded.
+    - memory_limit_mb (int): Memory per worker in MB (POSIX only), enforced as an address space limit on
+      top of what the worker has mapped when it starts (VmSize; without /proc it caps the total).
+    - solver_threads (int): Gurobi threads per worker. Defaults to 1 if several workers run in parallel
+      (so that workers do not oversubscribe the CPU) and to Gurobi's automatic choice otherwise.
+
+    Returns:
+    - dict: Number of instances per final status.
+    """
+    pending = iter(instances)
+    running = {}  # conn -> (process, entry, start time)
+    status_counts = {}
+    if solver_threads is None:
+        solver_threads = 1 if workers > 1 else 0
+
+    def emit(record):
+        status_counts[record['status']] = status_counts.get(record['status'], 0) + 1
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+
+    while True:
+        # Keep the pool filled
+        while len(running) < workers:
+            entry = next(pending, None)
+            if entry is None:
+                break
+            recv_conn, send_conn = mp.Pipe(duplex=False)
+            process = mp.Process(target=_run_instance,
+                                 args=(send_conn, entry, mode, memory_limit_mb, solver_threads))
+            process.start()
+            send_conn.close()
+            running[recv_conn] = (process, entry, time.monotonic())
+
+        if not running:
+            break
+
+        for conn in wait(list(running), timeout=0.1):
+            process, entry, _ = running.pop(conn)
+            try:
+                record = conn.recv()
+            except EOFError:
+                # The worker died without reporting (e.g. killed by the OS)
+                record = {'id': entry['id'], 'path': entry['path'], 'status': 'crashed'}
+            conn.close()
+            process.join()
+            if record['status'] == 'crashed':
+                record['exitcode'] = process.exitcode
+            emit(record)
+
+        # Kill workers that ran out of time
+        if time_limit is not None:
+            now = time.monotonic()
+            for conn, (process, entry, started) in list(running.items()):
+                if now - started > time_limit:
+                    process.kill()
+                    process.join()
+                    conn.close()
+                    del running[conn]
+                    emit({'id': entry['id'], 'path': entry['path'], 'status': 'timeout',
+                          'wall_s': now - started})
+
+    return status_counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute min cuts over time and T~ for a batch of instances.")
+    parser.add_argument('instances', help="Directory of .npz instances or a JSON/JSON Lines manifest.")
+    parser.add_argument('-o', '--output', default='-', help="JSON Lines output file (default: stdout).")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="Number of parallel workers.")
+    parser.add_argument('--mode', choices=['aggregate', 'min-cut', 'both'], default='both')
+    parser.add_argument('--time-limit', type=float, default=None, help="Seconds per instance.")
+    parser.add_argument('--memory-limit', type=int, default=None,
+                        help="MB of memory per instance, on top of what a freshly started worker uses.")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Gurobi threads per worker (default: 1 with several workers, else automatic).")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        status_counts = run_batch(iter_instances(args.instances), out, workers=args.workers, mode=args.mode,
+                                  time_limit=args.time_limit, memory_limit_mb=args.memory_limit,
+                                  solver_threads=args.threads)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print('Finished:', status_counts, file=sys.stderr)
+    return 0 if set(status_counts) <= {'ok'} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
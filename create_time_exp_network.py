@@ -1,4 +1,5 @@
 import networkx as nx
+from auxiliary_functions.instrumentation import get_instrumentation
 
 def create_time_expanded_network(G:nx.DiGraph, T:int):
     """
@@ -11,25 +12,31 @@ def create_time_expanded_network(G:nx.DiGraph, T:int):
     Returns:
     networkx.DiGraph: The time-expanded network as a directed graph.
     """
-    # Initialize the time-expanded graph
-    expanded_graph = nx.DiGraph()
+    stats = get_instrumentation()
+
+    with stats.timer('network.time_expanded'):
+        # Initialize the time-expanded graph
+        expanded_graph = nx.DiGraph()
     
-    # Step 1: Create time-expanded nodes for each original node at each time step
-    for t in range(T):
-        for node in G.nodes():
-            expanded_graph.add_node((node, t))
+        # Step 1: Create time-expanded nodes for each original node at each time step
+        for t in range(T):
+            for node in G.nodes():
+                expanded_graph.add_node((node, t))
     
-    # Step 2: Create edges based on the original graph structure
-    # Add transit edges according to the original graph
-    for t in range(T - 1):
-        for u, v in G.edges():
-            expanded_graph.add_edge((u, t), (v, t + 1))
+        # Step 2: Create edges based on the original graph structure
+        # Add transit edges according to the original graph
+        for t in range(T - 1):
+            for u, v in G.edges():
+                expanded_graph.add_edge((u, t), (v, t + 1))
     
-    # Step 3: Optionally add waiting edges to allow staying at a node across time steps
-    for t in range(T - 1):
-        for node in G.nodes():
-            expanded_graph.add_edge((node, t), (node, t + 1))
+        # Step 3: Optionally add waiting edges to allow staying at a node across time steps
+        for t in range(T - 1):
+            for node in G.nodes():
+                expanded_graph.add_edge((node, t), (node, t + 1))
     
+    stats.count('network.time_expanded_nodes', expanded_graph.number_of_nodes())
+    stats.count('network.time_expanded_arcs', expanded_graph.number_of_edges())
+
     return expanded_graph
 
 G = nx.DiGraph()
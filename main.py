@@ -2,6 +2,7 @@
 from auxiliary_functions.networkx_utilities import create_graph, visualize_graph
 from auxiliary_functions.generalized_ext_network import aggregate_cut_time_points
 from auxiliary_functions.min_cut_LP import min_cut_over_time
+from auxiliary_functions.instrumentation import enable_instrumentation
 
 # Parameters (these should be defined based on your data)
 # arcs = [(1, 2), (1, 3), (2, 4), (3, 4)]  # Arcs in the network
@@ -21,6 +22,9 @@ time_horizon = 4  # The value of T
 
 #%% 
 
+# Collect per-stage timers and counters of this run
+stats = enable_instrumentation()
+
 terminals = [1, 2, 3, 4]
 sources = [1]  # Example S+
 sinks = [4]  # Example S-
@@ -34,6 +38,8 @@ print('T~:', time_points)
 # Compute the min cut values 
 alpha, _ = min_cut_over_time(arcs, capacities, transit_times, time_horizon, S_plus_X, S_minus_X)
 
+print('Run statistics:', stats.to_json())
+
 # Create the graph and display the Min-Cut-values
 G = create_graph(arcs, capacities, transit_times, alpha=alpha)
 visualize_graph(G, S_plus_X, S_minus_X)
@@ -0,0 +1,57 @@
+import io
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('gurobipy')
+
+from gurobipy import GurobiError
+from pandas.errors import ParserError
+
+from batch_runner import _is_out_of_memory, iter_instances, run_batch
+
+
+def _write_arcs(path, arcs, capacities, transit_times):
+    pd.DataFrame({'tail': [a[0] for a in arcs], 'head': [a[1] for a in arcs], 'capacity': capacities,
+                  'transit_time': transit_times}).to_csv(path, index=False)
+
+
+def test_is_out_of_memory():
+    assert _is_out_of_memory(MemoryError())
+    assert _is_out_of_memory(GurobiError(10001, 'Out of memory'))
+    assert not _is_out_of_memory(GurobiError(10003, 'Invalid argument'))
+    assert _is_out_of_memory(ParserError('Error tokenizing data. C error: out of memory'))
+    assert not _is_out_of_memory(ValueError('bad value'))
+
+
+def test_run_batch_streams_results(tmp_path):
+    _write_arcs(tmp_path / 'small.csv', [(1, 2), (1, 3), (2, 4), (3, 4), (2, 3)], [1, 1, 1, 2, 2], [1, 1, 1, 1, 0])
+    with open(tmp_path / 'manifest.jsonl', 'w') as f:
+        f.write(json.dumps({'path': 'small.csv', 'sources': [1], 'sinks': [4], 'time_horizon': 4}) + '\n')
+        f.write(json.dumps({'path': 'missing.csv', 'sources': [1], 'sinks': [4], 'time_horizon': 4}) + '\n')
+
+    out = io.StringIO()
+    status_counts = run_batch(iter_instances(str(tmp_path / 'manifest.jsonl')), out, workers=2)
+    records = {r['id']: r for r in map(json.loads, out.getvalue().splitlines())}
+
+    assert status_counts == {'ok': 1, 'error': 1}
+    assert records['small']['time_points'] == [0, 3, 4]
+    assert records['small']['alpha'] == {'1': 0, '2': 3, '3': 3, '4': 4}
+    assert records['missing']['status'] == 'error'
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="relies on /proc and RLIMIT_AS")
+def test_run_batch_reports_memory_limit(tmp_path):
+    n = 300000
+    _write_arcs(tmp_path / 'big.csv', list(zip(range(n), range(1, n + 1))), np.ones(n, dtype=int), np.ones(n, dtype=int))
+    with open(tmp_path / 'manifest.jsonl', 'w') as f:
+        f.write(json.dumps({'path': 'big.csv', 'sources': [0], 'sinks': [5], 'time_horizon': 3}) + '\n')
+
+    out = io.StringIO()
+    status_counts = run_batch(iter_instances(str(tmp_path / 'manifest.jsonl')), out, mode='min-cut',
+                              memory_limit_mb=2)
+
+    assert status_counts == {'memory_limit': 1}
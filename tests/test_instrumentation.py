@@ -0,0 +1,118 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+from auxiliary_functions.instrumentation import (Instrumentation, get_instrumentation, enable_instrumentation,
+                                                 disable_instrumentation)
+
+
+ARCS = [(1, 2), (1, 3), (2, 4), (3, 4), (2, 3)]
+CAPACITIES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 2, (2, 3): 2}
+TRANSIT_TIMES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 1, (2, 3): 0}
+
+
+@pytest.fixture(autouse=True)
+def restore_default():
+    yield
+    disable_instrumentation()
+
+
+def test_timers_and_counters_accumulate():
+    stats = Instrumentation()
+    stats.record_time('solve', 0.5)
+    stats.record_time('solve', 1.5)
+    with stats.timer('build'):
+        pass
+    stats.count('solves')
+    stats.count('solves', 2)
+
+    summary = stats.summary()
+    assert summary['timers']['solve'] == {'calls': 2, 'total_s': 2.0, 'max_s': 1.5}
+    assert summary['timers']['build']['calls'] == 1
+    assert summary['timers']['build']['total_s'] >= 0
+    assert summary['counters'] == {'solves': 3}
+
+
+def test_hooks_receive_every_measurement():
+    calls = []
+    stats = Instrumentation(hooks=[lambda *args: calls.append(args)])
+    stats.record_time('solve', 0.25)
+    stats.count('solves', 3)
+
+    assert calls == [('timer', 'solve', 0.25), ('counter', 'solves', 3)]
+
+
+def test_failing_hook_does_not_interrupt():
+    calls = []
+
+    def failing_hook(kind, name, value):
+        raise RuntimeError('hook failed')
+
+    stats = Instrumentation(hooks=[failing_hook, lambda *args: calls.append(args)])
+    with pytest.warns(RuntimeWarning, match='hook failed'):
+        with stats.timer('solve'):
+            pass
+    with pytest.warns(RuntimeWarning):
+        stats.count('solves')
+
+    assert [c[:2] for c in calls] == [('timer', 'solve'), ('counter', 'solves')]
+    assert stats.summary()['counters'] == {'solves': 1}
+
+
+def test_to_json(tmp_path):
+    stats = Instrumentation()
+    stats.record_time('solve', 1.0)
+    stats.count('solves')
+    path = tmp_path / 'stats.json'
+
+    text = stats.to_json(path)
+    assert json.loads(text) == stats.summary()
+    assert json.loads(path.read_text()) == stats.summary()
+
+
+def test_disabled_records_nothing():
+    calls = []
+    stats = Instrumentation(enabled=False, hooks=[lambda *args: calls.append(args)])
+    with stats.timer('solve'):
+        pass
+    stats.record_time('solve', 1.0)
+    stats.count('solves')
+
+    assert stats.summary() == {'timers': {}, 'counters': {}}
+    assert calls == []
+
+
+def test_enable_and_disable():
+    assert not get_instrumentation().enabled
+
+    stats = enable_instrumentation()
+    assert stats.enabled and get_instrumentation() is stats
+
+    disable_instrumentation()
+    assert not get_instrumentation().enabled
+
+
+def test_solver_pipeline_is_instrumented():
+    pytest.importorskip('gurobipy')
+    from auxiliary_functions.min_cut_LP import min_cut_over_time
+    from auxiliary_functions.generalized_ext_network import aggregate_cut_time_points, all_valid_subsets
+
+    sources, sinks = [1, 2], [3, 4]
+    stats = enable_instrumentation()
+    with contextlib.redirect_stdout(io.StringIO()):
+        aggregate_cut_time_points(sources, sinks, ARCS, CAPACITIES, TRANSIT_TIMES, 4)
+
+    summary = stats.summary()
+    num_subsets = len(all_valid_subsets(sources, sinks))
+    assert summary['counters']['aggregate.subsets_processed'] == num_subsets
+    assert summary['counters']['min_cut.solves'] == num_subsets
+    assert summary['counters']['min_cut.lp_iterations'] >= 0
+    assert summary['timers']['min_cut.solve']['calls'] == num_subsets
+
+    # The default (disabled) instrumentation records nothing
+    disable_instrumentation()
+    with contextlib.redirect_stdout(io.StringIO()):
+        min_cut_over_time(ARCS, CAPACITIES, TRANSIT_TIMES, 4, [1], [4])
+    assert get_instrumentation().summary() == {'timers': {}, 'counters': {}}
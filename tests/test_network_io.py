@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auxiliary_functions.network_io import (load_arcs_csv, save_instance_npz, load_instance_npz,
+                                            network_from_instance)
+
+
+ARCS = [(1, 2), (1, 3), (2, 4), (3, 4), (2, 3)]
+CAPACITIES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 2, (2, 3): 2}
+TRANSIT_TIMES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 1, (2, 3): 0}
+
+
+def _relabel(label):
+    return f'v{label}'
+
+
+def test_load_arcs_csv_chunked(tmp_path):
+    path = tmp_path / 'arcs.csv'
+    pd.DataFrame({'tail': [a[0] for a in ARCS], 'head': [a[1] for a in ARCS],
+                  'capacity': [CAPACITIES[a] for a in ARCS],
+                  'transit_time': [TRANSIT_TIMES[a] for a in ARCS]}).to_csv(path, index=False)
+
+    assert load_arcs_csv(path) == (ARCS, CAPACITIES, TRANSIT_TIMES)
+    assert load_arcs_csv(path, chunksize=2) == (ARCS, CAPACITIES, TRANSIT_TIMES)
+
+
+def test_load_arcs_csv_rejects_parallel_arcs(tmp_path):
+    path = tmp_path / 'arcs.csv'
+    pd.DataFrame({'tail': [1, 1], 'head': [2, 2], 'capacity': [1, 2], 'transit_time': [1, 1]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        load_arcs_csv(path, chunksize=1)
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_instance_round_trip_int_labels(tmp_path, mmap):
+    path = tmp_path / 'instance.npz'
+    save_instance_npz(path, ARCS, CAPACITIES, TRANSIT_TIMES, [1], [4], 4, supplies={1: 3, 4: -3})
+
+    instance = load_instance_npz(path, mmap=mmap)
+    assert network_from_instance(instance) == (ARCS, CAPACITIES, TRANSIT_TIMES)
+    assert instance['sources'] == [1]
+    assert instance['sinks'] == [4]
+    assert instance['time_horizon'] == 4
+    assert instance['supplies'] == {1: 3.0, 2: 0.0, 3: 0.0, 4: -3.0}
+    assert isinstance(instance['arrays']['tails'], np.memmap) == mmap
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_instance_round_trip_str_labels(tmp_path, mmap):
+    arcs = [(_relabel(v), _relabel(w)) for v, w in ARCS]
+    capacities = {(_relabel(v), _relabel(w)): c for (v, w), c in CAPACITIES.items()}
+    transit_times = {(_relabel(v), _relabel(w)): t for (v, w), t in TRANSIT_TIMES.items()}
+    path = tmp_path / 'instance.npz'
+    save_instance_npz(path, arcs, capacities, transit_times, ['v1'], ['v4'], 6)
+
+    instance = load_instance_npz(path, mmap=mmap)
+    assert network_from_instance(instance) == (arcs, capacities, transit_times)
+    assert instance['sources'] == ['v1']
+    assert instance['sinks'] == ['v4']
+    assert instance['time_horizon'] == 6
+
+
+def test_instance_round_trip_empty_sinks(tmp_path):
+    path = tmp_path / 'instance.npz'
+    save_instance_npz(path, ARCS, CAPACITIES, TRANSIT_TIMES, [1], [], 4)
+
+    instance = load_instance_npz(path)
+    assert instance['sinks'] == []
+    assert network_from_instance(instance) == (ARCS, CAPACITIES, TRANSIT_TIMES)
+
+
+def test_mmap_matches_in_memory_load(tmp_path):
+    path = tmp_path / 'instance.npz'
+    save_instance_npz(path, ARCS, CAPACITIES, TRANSIT_TIMES, [1, 2], [4], 5)
+
+    mapped = load_instance_npz(path, mmap=True)
+    loaded = load_instance_npz(path, mmap=False)
+    assert mapped['arrays'].keys() == loaded['arrays'].keys()
+    for key in loaded['arrays']:
+        np.testing.assert_array_equal(mapped['arrays'][key], loaded['arrays'][key])
+        assert mapped['arrays'][key].dtype == loaded['arrays'][key].dtype
+
+
+def test_mmap_rejects_compressed_archive(tmp_path):
+    path = tmp_path / 'instance.npz'
+    np.savez_compressed(path, nodes=np.arange(3))
+
+    with pytest.raises(ValueError):
+        load_instance_npz(path, mmap=True)
+
+
+@pytest.mark.parametrize('arcs', [[(1, 'hub'), ('hub', 2)], [((0, 1), (0, 2))], [(1.5, 2.5)], [(True, False)]])
+def test_save_rejects_labels_that_do_not_round_trip(tmp_path, arcs):
+    capacities = {a: 1 for a in arcs}
+    transit_times = {a: 1 for a in arcs}
+
+    with pytest.raises(ValueError):
+        save_instance_npz(tmp_path / 'instance.npz', arcs, capacities, transit_times, [arcs[0][0]], [arcs[-1][1]], 4)
+    assert not (tmp_path / 'instance.npz').exists()
+
+
+def test_instance_path_without_suffix(tmp_path):
+    save_instance_npz(tmp_path / 'instance', ARCS, CAPACITIES, TRANSIT_TIMES, [1], [4], 4)
+
+    assert (tmp_path / 'instance.npz').exists()
+    assert network_from_instance(load_instance_npz(tmp_path / 'instance')) == (ARCS, CAPACITIES, TRANSIT_TIMES)
@@ -0,0 +1,77 @@
+import contextlib
+import io
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip('gurobipy')
+
+from auxiliary_functions.min_cut_LP import min_cut_over_time
+from auxiliary_functions.generalized_ext_network import aggregate_cut_time_points
+from auxiliary_functions.scenario_batch import solve_scenario_batch
+
+
+SOURCES, SINKS = [0, 1], [8, 9]
+
+
+def _scenarios(seed, num_scenarios=6, num_nodes=10, num_arcs=30):
+    rng = random.Random(seed)
+    arcs = list(dict.fromkeys((rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(num_arcs)))
+    arcs = [a for a in arcs if a[0] != a[1]]
+    arcs += [a for a in [(0, 2), (1, 3), (2, 8), (3, 9)] if a not in arcs]
+
+    # Zero capacities make many cuts optimal, so the result depends on which optimum the solver returns
+    capacities = np.array([[rng.choice([0, 0, 1, 2, 3]) for _ in arcs] for _ in range(num_scenarios)])
+    transit_times = np.array([[rng.randint(0, 3) for _ in arcs] for _ in range(num_scenarios)])
+    return arcs, capacities, transit_times
+
+
+def _reference(arcs, capacities, transit_times, time_horizon):
+    # Separate calls for every scenario
+    nodes = list(dict.fromkeys(v for a in arcs for v in a))
+    alpha_values, time_points = [], []
+    for caps, taus in zip(capacities, transit_times):
+        caps, taus = dict(zip(arcs, caps.tolist())), dict(zip(arcs, taus.tolist()))
+        with contextlib.redirect_stdout(io.StringIO()):
+            alpha, _ = min_cut_over_time(arcs, caps, taus, time_horizon, SOURCES, SINKS)
+            time_points.append(aggregate_cut_time_points(SOURCES, SINKS, arcs, caps, taus, time_horizon))
+        alpha_values.append([alpha[v] for v in nodes])
+    return nodes, alpha_values, time_points
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('seed', range(3))
+def test_matches_separate_calls(seed, workers):
+    arcs, capacities, transit_times = _scenarios(seed)
+    nodes, alpha_values, time_points = _reference(arcs, capacities, transit_times, time_horizon=6)
+
+    result = solve_scenario_batch(SOURCES, SINKS, arcs, capacities, transit_times, 6, workers=workers)
+
+    assert result['nodes'] == nodes
+    assert result['alpha'].tolist() == alpha_values
+    assert [np.flatnonzero(row).tolist() for row in result['time_points']] == time_points
+
+
+def test_warm_start_keeps_cut_values():
+    arcs, capacities, transit_times = _scenarios(0)
+    result = solve_scenario_batch(SOURCES, SINKS, arcs, capacities, transit_times, 6, warm_start=True)
+
+    # Alternative optima are allowed, but every alpha must be a min cut of its scenario
+    nodes = result['nodes']
+    for caps, taus, alpha_row in zip(capacities, transit_times, result['alpha']):
+        alpha = dict(zip(nodes, alpha_row.tolist()))
+        caps, taus = dict(zip(arcs, caps.tolist())), dict(zip(arcs, taus.tolist()))
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference, _ = min_cut_over_time(arcs, caps, taus, 6, SOURCES, SINKS)
+
+        def cut_value(a):
+            return sum(caps[(v, w)] * max(0, a[w] - a[v] - taus[(v, w)]) for v, w in arcs)
+
+        assert cut_value(alpha) == cut_value(reference)
+
+
+def test_rejects_mismatched_matrices():
+    arcs, capacities, transit_times = _scenarios(0)
+    with pytest.raises(ValueError):
+        solve_scenario_batch(SOURCES, SINKS, arcs, capacities, transit_times[:, 1:], 6)
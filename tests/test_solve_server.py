@@ -0,0 +1,162 @@
+import asyncio
+import io
+import contextlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('gurobipy')
+
+from auxiliary_functions.min_cut_LP import min_cut_over_time
+from auxiliary_functions.solve_server import SolveServer, SolveClient, LocalSolveClient
+
+
+ARCS = [(1, 2), (1, 3), (2, 4), (3, 4), (2, 3)]
+CAPACITIES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 2, (2, 3): 2}
+TRANSIT_TIMES = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 1, (2, 3): 0}
+
+
+def _reference(T, S_plus_X, S_minus_X, arcs=ARCS, capacities=CAPACITIES, transit_times=TRANSIT_TIMES):
+    with contextlib.redirect_stdout(io.StringIO()):
+        alpha, _ = min_cut_over_time(arcs, capacities, transit_times, T, S_plus_X, S_minus_X)
+    return alpha
+
+
+def _random_network(seed, num_nodes=40, num_arcs=150):
+    rng = random.Random(seed)
+    arcs = list(dict.fromkeys((rng.randrange(1, num_nodes), rng.randrange(1, num_nodes)) for _ in range(num_arcs)))
+    arcs = [(0, 1)] + [a for a in arcs if a[0] != a[1]] + [(num_nodes - 1, num_nodes)]
+    capacities = {a: rng.randint(1, 5) for a in arcs}
+    transit_times = {a: rng.randint(0, 3) for a in arcs}
+    return arcs, capacities, transit_times
+
+
+@pytest.fixture
+def server():
+    # Unix socket paths are limited to ~100 characters, so avoid pytest's long tmp_path
+    directory = tempfile.mkdtemp(prefix='solve_')
+    server = SolveServer(os.path.join(directory, 'solve.sock'), workers=2)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(30)
+    server.loop = loop
+    yield server
+
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(30)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(30)
+    shutil.rmtree(directory)
+
+
+def test_local_client_matches_min_cut_over_time():
+    with LocalSolveClient() as client, contextlib.redirect_stdout(io.StringIO()):
+        client.register('example', ARCS, CAPACITIES, TRANSIT_TIMES)
+        results = {(T, tuple(S_plus_X), tuple(S_minus_X)): client.min_cut('example', T, S_plus_X, S_minus_X)
+                   for T in range(1, 7) for S_plus_X, S_minus_X in [([1], [4]), ([1, 2], [4]), ([1], [3, 4])]}
+
+    for (T, S_plus_X, S_minus_X), alpha in results.items():
+        assert alpha == _reference(T, list(S_plus_X), list(S_minus_X))
+
+
+def test_local_client_recovers_from_bad_request():
+    with LocalSolveClient() as client, contextlib.redirect_stdout(io.StringIO()):
+        client.register('example', ARCS, CAPACITIES, TRANSIT_TIMES)
+        model = client.models['example']['model']
+        sizes = (model.NumVars, model.NumConstrs)
+
+        with pytest.raises(KeyError):
+            client.min_cut('example', 4, [1], [99])
+        assert (model.NumVars, model.NumConstrs) == sizes
+
+        assert client.min_cut('example', 2, [2], [3]) == _reference(2, [2], [3])
+        assert client.min_cut('example', 4, [1], [4]) == _reference(4, [1], [4])
+
+
+def test_socket_round_trip(server, capfd):
+    with SolveClient(server.path, timeout=30) as client:
+        assert client.ping()
+        client.register('example', ARCS, CAPACITIES, TRANSIT_TIMES)
+        for T in range(1, 7):
+            assert client.min_cut('example', T, [1], [4]) == _reference(T, [1], [4])
+        with pytest.raises(RuntimeError):
+            client.min_cut('unknown', 4, [1], [4])
+
+    # The warm environments are silent
+    assert 'Optimize a model' not in capfd.readouterr().out
+
+
+def test_bad_request_does_not_corrupt_environments(server):
+    with SolveClient(server.path, timeout=30) as client:
+        client.register('example', ARCS, CAPACITIES, TRANSIT_TIMES)
+
+        # Enough bad requests to reach every environment, then good ones on all of them
+        for _ in range(2 * server.workers):
+            with pytest.raises(RuntimeError, match='99'):
+                client.min_cut('example', 4, [1], [99])
+        for _ in range(2 * server.workers):
+            assert client.min_cut('example', 2, [2], [3]) == _reference(2, [2], [3])
+            assert client.min_cut('example', 4, [1], [4]) == _reference(4, [1], [4])
+
+
+def test_concurrent_register_and_min_cut(server):
+    networks = {name: _random_network(seed) for seed, name in enumerate('abc')}
+    with SolveClient(server.path, timeout=30) as client:
+        client.register('a', *networks['a'])
+
+    def request(job):
+        with SolveClient(server.path, timeout=30) as client:
+            if job[0] == 'register':
+                client.register(job[1], *networks[job[1]])
+                return client.min_cut(job[1], 10, [0], [40])
+            return client.min_cut('a', job[1], [0], [40])
+
+    # Solves in flight on both environments while two networks are (re-)registered
+    jobs = [('min_cut', T) for T in range(5, 25)] + [('register', 'b'), ('register', 'c'), ('register', 'a')]
+    with ThreadPoolExecutor(len(jobs)) as executor:
+        results = list(executor.map(request, jobs))
+
+    for job, alpha in zip(jobs, results):
+        if job[0] == 'register':
+            assert alpha == _reference(10, [0], [40], *networks[job[1]])
+        else:
+            assert alpha == _reference(job[1], [0], [40], *networks['a'])
+
+
+def test_register_while_environments_are_busy(server):
+    releases = [threading.Event() for _ in range(server.workers)]
+
+    def hold(slot, release):
+        release.wait(30)
+
+    def submit(coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, server.loop)
+
+    # Occupy both environments, register two networks while they are busy and free them one at a time
+    busy = [submit(server._run(hold, release)) for release in releases]
+    time.sleep(0.2)
+    registrations = [submit(server.register(name, *_random_network(seed))) for seed, name in enumerate('bc')]
+    time.sleep(0.2)
+    for release, future in zip(releases, busy):
+        release.set()
+        future.result(30)
+        time.sleep(0.2)
+
+    for future in registrations:
+        future.result(30)
+    assert submit(server.min_cut('b', 10, [0], [40])).result(30) == _reference(10, [0], [40], *_random_network(0))
+    assert server._slots.qsize() == server.workers
@@ -0,0 +1,99 @@
+import os
+import random
+import tempfile
+
+import networkx as nx
+import pytest
+
+from auxiliary_functions.time_expanded_csr import (write_time_expanded_csr, iter_time_slabs, earliest_arrival_times,
+                                                   max_flow_over_time)
+
+
+def _reference_expansion(arcs, capacities, transit_times, T, holdover_capacity=10000):
+    G = nx.DiGraph()
+    nodes = {v for a in arcs for v in a}
+    for t in range(T):
+        G.add_nodes_from((v, t) for v in nodes)
+        for a in arcs:
+            if t + transit_times[a] < T:
+                G.add_edge((a[0], t), (a[1], t + transit_times[a]), capacity=capacities[a])
+        if t + 1 < T:
+            for v in nodes:
+                G.add_edge((v, t), (v, t + 1), capacity=holdover_capacity)
+    return G
+
+
+def _reference_max_flow(G, sources, sinks, T):
+    G = G.copy()
+    for s in sources:
+        G.add_edge('source', (s, 0), capacity=float('inf'))
+    for s in sinks:
+        G.add_edge((s, T - 1), 'sink', capacity=float('inf'))
+    return nx.maximum_flow_value(G, 'source', 'sink')
+
+
+def _reference_earliest_arrival(G, sources, nodes):
+    usable = G.edge_subgraph([(v, w) for v, w, c in G.edges(data='capacity') if c > 0])
+    reached = {(s, 0) for s in sources}
+    for s in sources:
+        if (s, 0) in usable:
+            reached |= nx.descendants(usable, (s, 0))
+    return {v: min((t for u, t in reached if u == v), default=None) for v in nodes}
+
+
+def _random_instance(seed):
+    rng = random.Random(seed)
+    num_nodes = rng.randint(3, 7)
+    arcs = list(dict.fromkeys((rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(2 * num_nodes)))
+    arcs = [a for a in arcs if a[0] != a[1]] or [(0, 1)]
+    capacities = {a: rng.randint(0, 3) for a in arcs}
+    transit_times = {a: rng.randint(0, 3) for a in arcs}
+    return arcs, capacities, transit_times, rng.randint(1, 12), rng.randint(1, 5)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_matches_networkx(tmp_path, seed):
+    arcs, capacities, transit_times, T, slab_size = _random_instance(seed)
+    nodes = list(dict.fromkeys(v for a in arcs for v in a))
+    sources, sinks = [nodes[0]], [nodes[-1]]
+    meta = write_time_expanded_csr(tmp_path / 'expansion', arcs, capacities, transit_times, T, slab_size=slab_size)
+    G = _reference_expansion(arcs, capacities, transit_times, T)
+
+    assert max_flow_over_time(meta, sources, sinks) == pytest.approx(_reference_max_flow(G, sources, sinks, T))
+    assert earliest_arrival_times(meta, sources) == _reference_earliest_arrival(G, sources, nodes)
+
+
+def test_uneven_slabs_and_zero_transit_times(tmp_path):
+    arcs = [(1, 2), (1, 3), (2, 4), (3, 4), (2, 3)]
+    capacities = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 2, (2, 3): 2}
+    transit_times = {(1, 2): 1, (1, 3): 1, (2, 4): 1, (3, 4): 1, (2, 3): 0}
+    T = 7
+    G = _reference_expansion(arcs, capacities, transit_times, T)
+
+    for slab_size in (2, 3, 4, 5, 7, 10):
+        meta = write_time_expanded_csr(tmp_path / f'expansion_{slab_size}', arcs, capacities, transit_times, T,
+                                       slab_size=slab_size)
+        slabs = list(iter_time_slabs(meta))
+        assert [(s['t_start'], s['t_end']) for s in slabs] == [(t, min(t + slab_size, T)) for t in range(0, T, slab_size)]
+        assert sum(len(s['heads']) for s in slabs) == G.number_of_edges()
+
+        assert max_flow_over_time(meta, [1], [4]) == pytest.approx(_reference_max_flow(G, [1], [4], T))
+        assert earliest_arrival_times(meta, [1]) == _reference_earliest_arrival(G, [1], [1, 2, 3, 4])
+
+
+def test_work_dir_handling(tmp_path, monkeypatch):
+    arcs, capacities, transit_times, T, slab_size = _random_instance(0)
+    nodes = list(dict.fromkeys(v for a in arcs for v in a))
+    meta = write_time_expanded_csr(tmp_path / 'expansion', arcs, capacities, transit_times, T, slab_size=slab_size)
+
+    # A given work directory is created and keeps the flow values
+    work_dir = tmp_path / 'new' / 'work_dir'
+    max_flow_over_time(meta, [nodes[0]], [nodes[-1]], work_dir=str(work_dir))
+    assert os.path.exists(work_dir / 'flow.npy')
+
+    # The default temporary work directory is removed afterwards
+    scratch = tmp_path / 'scratch'
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(scratch))
+    max_flow_over_time(meta, [nodes[0]], [nodes[-1]])
+    assert os.listdir(scratch) == []